@@ -1,96 +1,198 @@
 # backtester.py
+import atexit
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Optional
+
+import joblib
 import yfinance as yf
+from curl_cffi import requests as curl_requests
+import numpy as np
 import pandas as pd
 import plotly.graph_objs as go
 from itertools import product
 
+from numba import njit, prange
+
+from core.strategies import MovingAverageCrossoverStrategy, _ma_cross_signals
+
+
+# One keep-alive session for every download so cache misses reuse the
+# TCP/TLS connection. yfinance only accepts curl_cffi sessions.
+_SESSION = curl_requests.Session(impersonate="chrome")
+
+
+# Completed date ranges are also kept on disk so repeat runs survive restarts
+_MEMORY = joblib.Memory(".cache/fetch", verbose=0)
+
+
+def _fetch(symbol, start_date, end_date):
+    df = yf.download(symbol, start=start_date, end=end_date, auto_adjust=False, session=_SESSION)
+
+    # yfinance reports failures (rate limits, network errors) as an empty
+    # frame. Raising keeps it out of both caches, so a retry downloads again.
+    if df.empty:
+        raise ValueError(f"No price data for {symbol}")
+
+    # If the result is multi-level column (e.g., from multiple tickers), fix it
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.get_level_values(0)
+
+    df = df[['Open', 'High', 'Low', 'Close', 'Volume']]  # Safe now
+
+    # Prices only need float32; cash/equity are accumulated in float64 in run()
+    prices = ['Open', 'High', 'Low', 'Close']
+    return df.dropna().astype(dict.fromkeys(prices, np.float32))
+
+
+_fetch_persisted = _MEMORY.cache(_fetch)
+
+
+def _download(symbol, start_date, end_date):
+    # Callers must copy the result before mutating it.
+    if end_date is None or pd.Timestamp(end_date) > pd.Timestamp.today().normalize():
+        # Range runs up to today's (unfinished) bar; don't cache it anywhere
+        return _fetch(symbol, start_date, end_date)
+
+    return _download_complete(symbol, start_date, end_date)
+
+
+@lru_cache(maxsize=64)
+def _download_complete(symbol, start_date, end_date):
+    # Cached per (symbol, start, end) so parameter sweeps only hit Yahoo once
+    return _fetch_persisted(symbol, start_date, end_date)
+
+
+@lru_cache(maxsize=4096)
+def _make_strategy(strategy_class, frozen_params):
+    # Strategies hold only their parameters, so one instance per
+    # (class, params) can be shared. frozen_params is a sorted items tuple.
+    return strategy_class(**dict(frozen_params))
+
+
+@dataclass
+class BacktestState:
+    # Struct-of-arrays for the backtest hot path: one contiguous array per series
+    index: pd.Index
+    close: np.ndarray
+    indicators: dict = field(default_factory=dict)
+    signal: Optional[np.ndarray] = None
+    position: Optional[np.ndarray] = None
+    trade: Optional[np.ndarray] = None
+    cash: Optional[np.ndarray] = None
+    holdings: Optional[np.ndarray] = None
+    total: Optional[np.ndarray] = None
+    returns: Optional[np.ndarray] = None
+    running_max: Optional[np.ndarray] = None
+    drawdown: Optional[np.ndarray] = None
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                "Close": self.close,
+                **self.indicators,
+                "Signal": self.signal,
+                "Position": self.position,
+                "Trade": self.trade,
+                "Cash": self.cash,
+                "Holdings": self.holdings,
+                "Total": self.total,
+                "Returns": self.returns,
+            },
+            index=self.index,
+        )
+
+
 class Backtester:
     def __init__(self, symbol, strategy, initial_cash: float = 100000):
         self.symbol = symbol
         self.strategy = strategy
         self.initial_cash = initial_cash
         self.df = None
+        self.state = None
 
     def fetch_data(self, start_date, end_date):
-        df = yf.download(self.symbol, start=start_date, end=end_date, auto_adjust=False)
-
-        # If the result is multi-level column (e.g., from multiple tickers), fix it
-        if isinstance(df.columns, pd.MultiIndex):
-            df.columns = df.columns.get_level_values(0)
-
-        df = df[['Open', 'High', 'Low', 'Close', 'Volume']]  # Safe now
-        df.dropna(inplace=True)
-        self.df = df
+        self.df = _download(self.symbol, start_date, end_date).copy()
 
 
     def run(self):
         if self.df is None:
             raise ValueError("Data not loaded. Call fetch_data() first.")
 
-        self.df = self.strategy.generate_signals(self.df.copy())
-
-        self.df["Signal"] = self.df["Signal"].fillna(0).astype(int)
-        self.df["Position"] = self.df["Signal"].shift(1).fillna(0).astype(int)
+        state = BacktestState(index=self.df.index, close=self.df["Close"].to_numpy())
+        signal, _, state.indicators = self.strategy.generate_signals_np(state.close, self.df)
 
-        # Calculate trades (delta position)
-        self.df["Trade"] = self.df["Position"].diff().fillna(0)
+        # Signals stay int8 (1 byte/bar); they broadcast against float prices below
+        signal = np.nan_to_num(signal).astype(np.int8, copy=False)
+        close = state.close.astype(np.float64)
 
-        # Initialize cash and holdings
-        cash = self.initial_cash
-        quantity = 0
-        cash_history = []
-        holdings_history = []
-        total_history = []
+        # Act on the bar after the signal
+        position = np.zeros_like(signal)
+        position[1:] = signal[:-1]
+        trade = np.diff(position, prepend=np.int8(0))
 
-        for i in range(len(self.df)):
-            trade = self.df["Trade"].iloc[i]
-            price = float(self.df["Close"].iloc[i].item())  # Safer for scalars
+        # Quantity held is the position itself, so cash is a running sum of trade costs
+        cash = self.initial_cash - np.cumsum(trade * close)
+        holdings = position * close
+        total = cash + holdings
+        returns = np.zeros_like(total)
+        returns[1:] = total[1:] / total[:-1] - 1
 
+        # Shared by evaluate() and the drawdown figure
+        running_max = np.maximum.accumulate(total)
+        drawdown = total / running_max - 1
 
+        state.signal = signal
+        state.position = position
+        state.trade = trade
+        state.cash = cash
+        state.holdings = holdings
+        state.total = total
+        state.returns = returns
+        state.running_max = running_max
+        state.drawdown = drawdown
+        self.state = state
 
-            quantity += trade
-            cash -= trade * price
-            holdings = quantity * price
-            total = cash + holdings
 
-            cash_history.append(cash)
-            holdings_history.append(holdings)
-            total_history.append(total)
-
-        self.df["Cash"] = cash_history
-        self.df["Holdings"] = holdings_history
-        self.df["Total"] = total_history
-        self.df["Returns"] = self.df["Total"].pct_change().fillna(0)
 
 
+    def evaluate(self):
+        total = self.state.total
 
+        cumulative_return = total[-1] / self.initial_cash - 1
 
-    def evaluate(self):
-        cumulative_return = self.df["Total"].iloc[-1] / self.initial_cash - 1
-        sharpe_ratio = self.df["Returns"].mean() / self.df["Returns"].std() * (252 ** 0.5)
+        # Sharpe and volatility from daily log returns, one pass over Total
+        log_returns = np.diff(np.log(total))
+        std = log_returns.std(ddof=1)
+        # A strategy that never trades has zero std; NaN Sharpe, no warning
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sharpe_ratio = log_returns.mean() / std * np.sqrt(252)
 
         # Max Drawdown
-        running_max = self.df["Total"].cummax()
-        drawdown = self.df["Total"] / running_max - 1
-        max_drawdown = drawdown.min()
+        max_drawdown = self.state.drawdown.min()
 
         # Annualized Volatility
-        volatility = self.df["Returns"].std() * (252 ** 0.5)
+        volatility = std * np.sqrt(252)
 
         return cumulative_return, sharpe_ratio, max_drawdown, volatility
 
 
     def get_equity_curve_figure(self):
+        df = self.state.to_frame()
         fig = go.Figure()
-        fig.add_trace(go.Scatter(x=self.df.index, y=self.df["Total"], mode='lines', name="Portfolio Value"))
+        fig.add_trace(go.Scatter(x=df.index, y=df["Total"], mode='lines', name="Portfolio Value"))
         fig.update_layout(title="Portfolio Value Over Time", xaxis_title="Date", yaxis_title="Portfolio Value ($)")
         return fig
 
     def get_trade_signals_figure(self):
+        df = self.state.to_frame()
         fig = go.Figure()
-        fig.add_trace(go.Scatter(x=self.df.index, y=self.df["Close"], mode='lines', name="Price"))
-        buys = self.df[self.df["Trade"] == 1]
-        sells = self.df[self.df["Trade"] == -1]
+        fig.add_trace(go.Scatter(x=df.index, y=df["Close"], mode='lines', name="Price"))
+        buys = df[df["Trade"] == 1]
+        sells = df[df["Trade"] == -1]
         fig.add_trace(go.Scatter(
             x=buys.index,
             y=buys["Close"],
@@ -99,7 +201,7 @@ class Backtester:
             marker_color='green',
             marker_size=10,
             name='Buy',
-            text=["Buy on {}".format(d.date()) for d in buys.index],
+            text=buys.index.strftime("Buy on %Y-%m-%d").tolist(),
             hoverinfo='text+y'
         ))
         fig.add_trace(go.Scatter(
@@ -110,55 +212,50 @@ class Backtester:
             marker_color='red',
             marker_size=10,
             name='Sell',
-            text=[f"Sell on {d.date()}" for d in sells.index],
+            text=sells.index.strftime("Sell on %Y-%m-%d").tolist(),
             hoverinfo='text+y'
         ))
         fig.update_layout(title="Trade Signals on Price", xaxis_title="Date", yaxis_title="Price ($)")
         return fig
 
     def get_trade_log(self):
-        logs = []
-        open_trade = None
-
-        for i in range(1, len(self.df)):
-            trade = self.df["Trade"].iloc[i]
-            price = self.df["Close"].iloc[i]
-            date = self.df.index[i].strftime("%Y-%m-%d")
-
-            if trade == 1:
-                # Buy
-                open_trade = {
-                    "Date": date,
-                    "Action": "Buy",
-                    "Price": round(price, 2),
-                    "Quantity": 1,
-                    "P&L": ""
-                }
-                logs.append(open_trade)
-
-            elif trade == -1 and open_trade:
-                # Sell
-                pnl = round(price - open_trade["Price"], 2)  # 1 share assumed
-                logs.append({
-                    "Date": date,
-                    "Action": "Sell",
-                    "Price": round(price, 2),
-                    "Quantity": 1,
-                    "P&L": pnl
-                })
-                open_trade = None
-
-        return logs
+        trade = self.state.trade
+
+        # Unit buys/sells after the first bar, in date order
+        events = np.flatnonzero((trade == 1) | (trade == -1))
+        events = events[events > 0]
+        is_buy = trade[events] == 1
+
+        # A sell only closes a trade when the event right before it was a buy;
+        # that buy's price is the entry price for the P&L
+        closes = np.zeros_like(is_buy)
+        closes[1:] = ~is_buy[1:] & is_buy[:-1]
+        keep = is_buy | closes
+
+        price = self.state.close[events]
+        entry = np.roll(price, 1)
+        rows = events[keep]
+        dates = self.state.index[rows].strftime("%Y-%m-%d").tolist()
+
+        return [
+            {
+                "Date": date,
+                "Action": "Buy" if buy else "Sell",
+                "Price": round(p, 2),
+                "Quantity": 1,
+                "P&L": "" if buy else round(p - round(e, 2), 2)  # 1 share assumed
+            }
+            for date, buy, p, e in zip(
+                dates, is_buy[keep].tolist(), price[keep].tolist(), entry[keep].tolist()
+            )
+        ]
 
     
     def get_drawdown_figure(self):
-        running_max = self.df["Total"].cummax()
-        drawdown = self.df["Total"] / running_max - 1
-
         fig = go.Figure()
         fig.add_trace(go.Scatter(
-            x=self.df.index,
-            y=drawdown,
+            x=self.state.index,
+            y=self.state.drawdown,
             mode='lines',
             name='Drawdown',
             line=dict(color='firebrick'),
@@ -200,31 +297,177 @@ class Backtester:
 
 from itertools import product
 
-def run_parameter_grid_search(strategy_class, symbol, start_date, end_date, param_grid):
-    keys = list(param_grid.keys())
-    value_lists = list(param_grid.values())
-
-    results = []
-
-    for values in product(*value_lists):
-        param_combo = dict(zip(keys, values))
-        strategy = strategy_class(**param_combo)
-        bt = Backtester(symbol, strategy)
-        bt.fetch_data(start_date, end_date)
-        bt.run()
-        cum_ret, sharpe, max_dd, vol = bt.evaluate()
-
-        results.append({
-            **param_combo,
-            "Cumulative Return": round(cum_ret * 100, 2),
-            "Sharpe": round(sharpe, 2),
-            "Max Drawdown": round(max_dd * 100, 2),
-            "Volatility": round(vol, 2)
-        })
-
+_METRIC_FIELDS = ("Cumulative Return", "Sharpe", "Max Drawdown", "Volatility")
+
+
+def _grid_results(param_grid, combos, cum_ret, sharpe, max_dd, vol):
+    # One structured array row per combo: the param columns followed by the
+    # rounded metrics, in the same layout the optimizer table shows
+    dtype = [(k, np.asarray(list(v)).dtype) for k, v in param_grid.items()]
+    dtype += [(name, np.float64) for name in _METRIC_FIELDS]
+    results = np.empty(len(combos), dtype=dtype)
+    for k in param_grid:
+        results[k] = [combo[k] for combo in combos]
+    results["Cumulative Return"] = np.round(np.asarray(cum_ret) * 100, 2)
+    results["Sharpe"] = np.round(sharpe, 2)
+    results["Max Drawdown"] = np.round(np.asarray(max_dd) * 100, 2)
+    results["Volatility"] = np.round(vol, 2)
     return results
 
 
-
-
-
+# Created on first use and kept for the life of the process so repeated
+# searches in a long-lived process (scripts, notebooks) don't pay worker
+# start-up every time. Only grids of _POOL_MIN_COMBOS or more use it; the
+# dashboard's optimizer runs each search in a short-lived background job, so
+# there a large grid pays start-up once and the job shuts the pool down.
+# Each worker is handed the price frame once, when it starts, so the pool is
+# tied to one dataset and only replaced when a search asks for different data.
+_EXECUTOR = None
+_EXECUTOR_KEY = None
+
+# Set in each worker by _init_worker
+_WORKER_DF = None
+
+# Workers come from a fresh process, never a fork of this one: once the
+# parallel MA kernel has started Numba's (TBB) thread pool, forking from here
+# leaves the interpreter hanging at exit
+_MP_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+
+def _init_worker(df):
+    global _WORKER_DF
+    _WORKER_DF = df
+
+
+def _get_executor(key, df):
+    global _EXECUTOR, _EXECUTOR_KEY
+    if _EXECUTOR is not None and _EXECUTOR_KEY != key:
+        _EXECUTOR.shutdown(cancel_futures=True)
+        _EXECUTOR = None
+    if _EXECUTOR is None:
+        max_workers = int(os.environ.get("BACKTESTER_WORKERS", 0)) or os.cpu_count()
+        _EXECUTOR = ProcessPoolExecutor(
+            max_workers=max_workers, mp_context=_MP_CONTEXT, initializer=_init_worker, initargs=(df,)
+        )
+        _EXECUTOR_KEY = key
+    return _EXECUTOR
+
+
+@atexit.register
+def _shutdown_executor():
+    global _EXECUTOR, _EXECUTOR_KEY
+    if _EXECUTOR is not None:
+        _EXECUTOR.shutdown(cancel_futures=True)
+        _EXECUTOR = None
+        _EXECUTOR_KEY = None
+
+
+def _evaluate_combo(df, symbol, strategy_class, param_combo, initial_cash):
+    strategy = _make_strategy(strategy_class, tuple(sorted(param_combo.items())))
+    bt = Backtester(symbol, strategy, initial_cash)
+    bt.df = df
+    bt.run()
+    return bt.evaluate()
+
+
+def _run_one(symbol, strategy_class, param_combo, initial_cash):
+    return _evaluate_combo(_WORKER_DF, symbol, strategy_class, param_combo, initial_cash)
+
+
+# A single backtest on ten years of daily bars takes well under a millisecond,
+# while starting the pool (each worker importing numba/pandas/plotly) takes the
+# better part of a second, so anything short of a few thousand combos is
+# quicker run serially in this process
+_POOL_MIN_COMBOS = 2500
+
+
+@njit(parallel=True, cache=True, error_model="numpy")
+def _ma_cross_grid(close, short_ws, long_ws, initial_cash):
+    # One backtest per (short, long) pair, spread across threads with prange
+    # over the shared read-only close array. Mirrors Backtester.run and
+    # Backtester.evaluate for each pair.
+    n = close.shape[0]
+    k = short_ws.shape[0]
+    cum_ret = np.empty(k)
+    sharpe = np.empty(k)
+    max_dd = np.empty(k)
+    vol = np.empty(k)
+
+    for j in prange(k):
+        _, _, signal, _ = _ma_cross_signals(close, short_ws[j], long_ws[j])
+
+        log_total = np.empty(n)
+        cash = initial_cash
+        held = 0
+        total = cash
+        peak = -np.inf
+        worst = 0.0
+        for i in range(n):
+            # Act on the bar after the signal
+            position = np.int64(signal[i - 1]) if i > 0 else 0
+            price = np.float64(close[i])
+            cash -= (position - held) * price
+            held = position
+
+            total = cash + position * price
+            peak = max(peak, total)
+            worst = min(worst, total / peak - 1)
+            log_total[i] = np.log(total)
+
+        log_returns = np.diff(log_total)
+        mean = log_returns.mean()
+        std = np.sqrt(((log_returns - mean) ** 2).sum() / (n - 2))
+
+        cum_ret[j] = total / initial_cash - 1
+        sharpe[j] = mean / std * np.sqrt(252)
+        max_dd[j] = worst
+        vol[j] = std * np.sqrt(252)
+
+    return cum_ret, sharpe, max_dd, vol
+
+
+def run_parameter_grid_search(
+    strategy_class, symbol, start_date, end_date, param_grid, initial_cash: float = 100000, progress=None
+):
+    # progress, if given, is called as progress(done, total) as combos finish
+    keys = list(param_grid.keys())
+    combos = [dict(zip(keys, values)) for values in product(*param_grid.values())]
+
+    # Download once up front; each worker receives its own copy at start-up
+    df = _download(symbol, start_date, end_date)
+
+    if strategy_class is MovingAverageCrossoverStrategy:
+        strategies = [_make_strategy(strategy_class, tuple(sorted(combo.items()))) for combo in combos]
+        metrics = _ma_cross_grid(
+            df["Close"].to_numpy(),
+            np.array([s.short_window for s in strategies], dtype=np.int64),
+            np.array([s.long_window for s in strategies], dtype=np.int64),
+            float(initial_cash),
+        )
+        if progress is not None:
+            progress(len(combos), len(combos))
+        return _grid_results(param_grid, combos, *metrics)
+
+    metrics = np.empty((len(combos), len(_METRIC_FIELDS)))
+
+    if len(combos) < _POOL_MIN_COMBOS:
+        for done, combo in enumerate(combos, start=1):
+            metrics[done - 1] = _evaluate_combo(df, symbol, strategy_class, combo, initial_cash)
+            if progress is not None:
+                progress(done, len(combos))
+        return _grid_results(param_grid, combos, *metrics.T)
+
+    executor = _get_executor((symbol, start_date, end_date), df)
+    futures = {
+        executor.submit(_run_one, symbol, strategy_class, combo, initial_cash): i
+        for i, combo in enumerate(combos)
+    }
+
+    for done, future in enumerate(as_completed(futures), start=1):
+        metrics[futures[future]] = future.result()
+        if progress is not None:
+            progress(done, len(combos))
+
+    return _grid_results(param_grid, combos, *metrics.T)
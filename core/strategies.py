@@ -1,9 +1,151 @@
 # core/strategies.py
+from functools import lru_cache
+
+import bottleneck as bn
+import numpy as np
 import pandas as pd
+from numba import njit
+
+
+@njit(cache=True)
+def _wilder_rsi(close: np.ndarray, period: int) -> np.ndarray:
+    # Single pass: seed with the simple mean of the first `period` moves,
+    # then apply Wilder's smoothing avg = (avg * (period - 1) + x) / period
+    n = close.shape[0]
+    rsi = np.full(n, np.nan, dtype=close.dtype)
+    if n <= period:
+        return rsi
+
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(1, n):
+        delta = close[i] - close[i - 1]
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+
+        if i <= period:
+            avg_gain += gain / period
+            avg_loss += loss / period
+            if i < period:
+                continue
+        else:
+            avg_gain = (avg_gain * (period - 1) + gain) / period
+            avg_loss = (avg_loss * (period - 1) + loss) / period
+
+        if avg_loss > 0:
+            rsi[i] = 100 - 100 / (1 + avg_gain / avg_loss)
+        elif avg_gain > 0:
+            rsi[i] = 100.0
+    return rsi
+
+
+@njit(cache=True, inline="always")
+def _ma_cross_signals(close: np.ndarray, short_w: int, long_w: int):
+    # Both SMAs are kept as running sums (add newest, drop oldest) and the
+    # crossover signal and its diff are emitted in the same pass. Sums are
+    # accumulated in float64 even when close is float32
+    n = close.shape[0]
+    sma_short = np.full(n, np.nan, dtype=close.dtype)
+    sma_long = np.full(n, np.nan, dtype=close.dtype)
+    signal = np.zeros(n, dtype=np.int8)
+    position = np.zeros(n, dtype=np.int8)
+
+    warmup = max(short_w, long_w) - 1
+    ssum = 0.0
+    lsum = 0.0
+    for i in range(n):
+        ssum += close[i]
+        lsum += close[i]
+        if i >= short_w:
+            ssum -= close[i - short_w]
+        if i >= long_w:
+            lsum -= close[i - long_w]
+
+        if i >= short_w - 1:
+            sma_short[i] = ssum / short_w
+        if i >= long_w - 1:
+            sma_long[i] = lsum / long_w
+
+        if i >= warmup and sma_short[i] > sma_long[i]:
+            signal[i] = 1
+        if i > 0:
+            position[i] = signal[i] - signal[i - 1]
+    return sma_short, sma_long, signal, position
+
+
+# Window pairs that get their own kernel with the windows compiled in as
+# constants (the dashboard defaults). Anything else uses the generic kernel
+# rather than paying a compile per pair.
+_SPECIALIZED_MA_WINDOWS = {(20, 50)}
+
+
+@lru_cache(maxsize=None)
+def _make_ma_cross_kernel(short_w: int, long_w: int):
+    @njit(cache=True)
+    def kernel(close):
+        return _ma_cross_signals(close, short_w, long_w)
+
+    return kernel
+
+
+def _ma_cross(close: np.ndarray, short_w: int, long_w: int):
+    if (short_w, long_w) in _SPECIALIZED_MA_WINDOWS:
+        return _make_ma_cross_kernel(short_w, long_w)(close)
+    return _ma_cross_signals(close, short_w, long_w)
+
+
+def _signal_changes(signal: np.ndarray) -> np.ndarray:
+    position = np.zeros_like(signal)
+    position[1:] = np.diff(signal)
+    return position
+
+
+def _rsi_signals(rsi: np.ndarray):
+    signal = np.zeros(len(rsi), dtype=np.int8)
+    signal[rsi < 30] = 1    # Buy
+    signal[rsi > 70] = -1   # Sell
+    return signal, _signal_changes(signal)
+
+
+def _bollinger_bands(close: np.ndarray, window: int, num_std: float):
+    if len(close) < window:
+        nan = np.full(len(close), np.nan, dtype=close.dtype)
+        return nan, nan
+
+    # Bottleneck's running sums accumulate in the input dtype, and float32
+    # drifts badly over long series, so the window stats are taken in float64
+    close64 = close.astype(np.float64)
+    rolling_mean = bn.move_mean(close64, window, min_count=window)
+    rolling_std = bn.move_std(close64, window, min_count=window, ddof=1)
+
+    upper = rolling_mean + num_std * rolling_std
+    lower = rolling_mean - num_std * rolling_std
+    return upper, lower
+
+
+def _band_signals(close: np.ndarray, upper: np.ndarray, lower: np.ndarray):
+    signal = np.zeros(len(close), dtype=np.int8)
+    signal[close < lower] = 1    # Buy
+    signal[close > upper] = -1   # Sell
+    return signal, _signal_changes(signal)
+
 
 class Strategy:
+    def generate_signals_np(self, close: np.ndarray, df: pd.DataFrame = None):
+        # Array-level entry point used by Backtester.run. Returns
+        # (signal, position, extras), where extras maps indicator column
+        # names to arrays. Strategies that only implement generate_signals
+        # fall back to it here, on a copy of the full OHLCV frame when the
+        # caller has one.
+        if type(self).generate_signals is Strategy.generate_signals:
+            raise NotImplementedError("You must implement generate_signals_np")
+        df = pd.DataFrame({"Close": close}) if df is None else df.copy()
+        df = self.generate_signals(df)
+        return df["Signal"].to_numpy(), df["Position"].to_numpy(), {}
+
     def generate_signals(self, df: pd.DataFrame) -> pd.DataFrame:
-        raise NotImplementedError("You must implement generate_signals")
+        signal, position, extras = self.generate_signals_np(df["Close"].to_numpy())
+        return df.assign(**extras, Signal=signal, Position=position)
 
 
 class MovingAverageCrossoverStrategy(Strategy):
@@ -11,37 +153,19 @@ class MovingAverageCrossoverStrategy(Strategy):
         self.short_window = short_window
         self.long_window = long_window
 
-    def generate_signals(self, df: pd.DataFrame) -> pd.DataFrame:
-        df = df.copy()
-        df["SMA_short"] = df["Close"].rolling(window=self.short_window).mean()
-        df["SMA_long"] = df["Close"].rolling(window=self.long_window).mean()
-        df["Signal"] = (df["SMA_short"] > df["SMA_long"]).astype(float)
-        df["Position"] = df["Signal"].diff().fillna(0)
-        return df
+    def generate_signals_np(self, close: np.ndarray, df: pd.DataFrame = None):
+        sma_short, sma_long, signal, position = _ma_cross(close, self.short_window, self.long_window)
+        return signal, position, {"SMA_short": sma_short, "SMA_long": sma_long}
 
 
 class RSIStrategy(Strategy):
     def __init__(self, period=14):
         self.period = period
 
-    def generate_signals(self, df: pd.DataFrame) -> pd.DataFrame:
-        df = df.copy()
-        delta = df["Close"].diff()
-        gain = delta.where(delta > 0, 0)
-        loss = -delta.where(delta < 0, 0)
-
-        avg_gain = gain.rolling(window=self.period).mean()
-        avg_loss = loss.rolling(window=self.period).mean()
-
-        rs = avg_gain / avg_loss
-        df["RSI"] = 100 - (100 / (1 + rs))
-
-        df["Signal"] = 0
-        df.loc[df["RSI"] < 30, "Signal"] = 1    # Buy
-        df.loc[df["RSI"] > 70, "Signal"] = -1   # Sell
-
-        df["Position"] = df["Signal"].diff().fillna(0)
-        return df
+    def generate_signals_np(self, close: np.ndarray, df: pd.DataFrame = None):
+        rsi = _wilder_rsi(close, self.period)
+        signal, position = _rsi_signals(rsi)
+        return signal, position, {"RSI": rsi}
 
 
 class BollingerBandsStrategy(Strategy):
@@ -49,21 +173,10 @@ class BollingerBandsStrategy(Strategy):
         self.window = window
         self.num_std = num_std
 
-    def generate_signals(self, df: pd.DataFrame) -> pd.DataFrame:
-        df = df.copy()
-        rolling_mean = df["Close"].rolling(window=self.window).mean()
-        rolling_std = df["Close"].rolling(window=self.window).std()
-
-        df["Upper"] = rolling_mean + self.num_std * rolling_std
-        df["Lower"] = rolling_mean - self.num_std * rolling_std
-
-        df["Signal"] = 0
-        df.loc[df["Close"] < df["Lower"], "Signal"] = 1    # Buy
-        df.loc[df["Close"] > df["Upper"], "Signal"] = -1   # Sell
-
-        df["Signal"] = df["Signal"].astype(float)
-        df["Position"] = df["Signal"].diff().fillna(0)
-        return df
+    def generate_signals_np(self, close: np.ndarray, df: pd.DataFrame = None):
+        upper, lower = _bollinger_bands(close, self.window, self.num_std)
+        signal, position = _band_signals(close, upper, lower)
+        return signal, position, {"Upper": upper, "Lower": lower}
 
 
 # Strategy registry to reference in Dash app
@@ -1,20 +1,79 @@
 # dashboard.py
+import base64
 import datetime
+import math
+import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 
 import dash
-from dash import Dash, dcc, html, Input, Output, State, ctx, dash_table, ALL
+from dash import Dash, DiskcacheManager, dcc, html, Input, Output, State, ctx, dash_table, ALL
 import dash_bootstrap_components as dbc
 from dash.exceptions import PreventUpdate
+import diskcache
+from flask_caching import Cache
+import numpy as np
+import orjson
+import pandas as pd
 
-from core.backtester import Backtester, run_parameter_grid_search
+from core.backtester import Backtester, _make_strategy, _shutdown_executor, run_parameter_grid_search
 from core.strategies import strategy_registry
 
+# Optimizer runs execute in background processes, so a long grid search
+# doesn't tie up the web worker serving everyone else. Each job is a fresh
+# process, so in-process caches (downloads, strategies, the grid worker pool)
+# don't carry over between jobs; single backtests stay in the web process
+# where those caches live.
+background_callback_manager = DiskcacheManager(diskcache.Cache("./.bg-cache"))
+
 app = Dash(
     __name__,
     external_stylesheets=[dbc.themes.BOOTSTRAP],
     suppress_callback_exceptions=True,
+    background_callback_manager=background_callback_manager,
 )
 
+# Disk-backed so memoized runs are shared across gunicorn workers and restarts
+cache = Cache(app.server, config={"CACHE_TYPE": "FileSystemCache", "CACHE_DIR": ".dash_cache"})
+
+
+def _param_controls(strategy_name, params):
+    controls = []
+    for param_name, meta in params.items():
+        controls.append(
+            dbc.Row(
+                [
+                    dbc.Label(meta["label"], width=6),
+                    dbc.Col(
+                        dbc.InputGroup(
+                            [
+                                dbc.InputGroupText("Start"),
+                                dbc.Input(
+                                    id={"type": "opt-param", "strategy": strategy_name, "param": param_name, "role": "start"},
+                                    type="number",
+                                    value=int(meta["default"]),
+                                ),
+                                dbc.InputGroupText("Stop"),
+                                dbc.Input(
+                                    id={"type": "opt-param", "strategy": strategy_name, "param": param_name, "role": "stop"},
+                                    type="number",
+                                    value=int(meta["default"]) + 20,
+                                ),
+                                dbc.InputGroupText("Step"),
+                                dbc.Input(
+                                    id={"type": "opt-param", "strategy": strategy_name, "param": param_name, "role": "step"},
+                                    type="number",
+                                    value=10,
+                                ),
+                            ]
+                        )
+                    ),
+                ],
+                className="mb-2",
+            )
+        )
+    return controls
+
 
 app.layout = dbc.Container(
     [
@@ -47,7 +106,20 @@ app.layout = dbc.Container(
                             display_format="YYYY-MM-DD",
                             className="mb-2",
                         ),
-                        html.Div(id="strategy-params", className="mb-2"),
+                        # Controls for every strategy are rendered once and shown/hidden
+                        # client-side, so switching strategies keeps entered values
+                        html.Div(
+                            [
+                                html.Div(
+                                    _param_controls(name, info["params"]),
+                                    id={"type": "strategy-params", "strategy": name},
+                                    style={"display": "none"},
+                                )
+                                for name, info in strategy_registry.items()
+                            ],
+                            id="strategy-params",
+                            className="mb-2",
+                        ),
                         dbc.Button("Run Backtest", id="run-button", color="primary", className="mt-2"),
                     ],
                     width=4,
@@ -67,8 +139,12 @@ app.layout = dbc.Container(
                         # All tab content renders here (and ONLY here)
                         html.Div(id="tab-content", className="mt-3"),
                         html.Hr(),
-                        html.Div(id="metrics-output", className="mb-2"),
-                        html.Div(id="trade-log-output"),
+                        dcc.Loading(
+                            [
+                                html.Div(id="metrics-output", className="mb-2"),
+                                html.Div(id="trade-log-output"),
+                            ]
+                        ),
                     ],
                     width=8,
                 ),
@@ -83,54 +159,133 @@ app.layout = dbc.Container(
 
         # Store for best params from optimizer
         dcc.Store(id="best-params-store"),
+
+        # Key of the full optimizer result set held in the server-side cache
+        dcc.Store(id="opt-session-id"),
+
+        # {strategy: {param: {start, stop, step}}} mirrored from the param inputs
+        dcc.Store(id="param-values-store"),
     ],
     fluid=True,
 )
 
 
-@app.callback(
-    Output("strategy-params", "children"),
+app.clientside_callback(
+    """
+    function(selected, ids) {
+        return ids.map((id) => ({display: id.strategy === selected ? "block" : "none"}));
+    }
+    """,
+    Output({"type": "strategy-params", "strategy": ALL}, "style"),
     Input("strategy-dropdown", "value"),
+    State({"type": "strategy-params", "strategy": ALL}, "id"),
 )
-def update_strategy_params_ui(selected_strategy):
-    strategy_info = strategy_registry[selected_strategy]
-    controls = []
-    for param_name, meta in strategy_info["params"].items():
-        controls.append(
-            dbc.Row(
-                [
-                    dbc.Label(meta["label"], width=6),
-                    dbc.Col(
-                        dbc.InputGroup(
-                            [
-                                dbc.InputGroupText("Start"),
-                                dbc.Input(
-                                    id={"type": "opt-param", "param": param_name, "role": "start"},
-                                    type="number",
-                                    value=int(meta["default"]),
-                                ),
-                                dbc.InputGroupText("Stop"),
-                                dbc.Input(
-                                    id={"type": "opt-param", "param": param_name, "role": "stop"},
-                                    type="number",
-                                    value=int(meta["default"]) + 20,
-                                ),
-                                dbc.InputGroupText("Step"),
-                                dbc.Input(
-                                    id={"type": "opt-param", "param": param_name, "role": "step"},
-                                    type="number",
-                                    value=10,
-                                ),
-                            ]
-                        )
-                    ),
-                ],
-                className="mb-2",
-            )
-        )
-    return controls
 
 
+# Keep a compact copy of every param input's value, so the run callbacks read
+# one small dict instead of six aligned value/id lists
+app.clientside_callback(
+    """
+    function(values, ids) {
+        const store = {};
+        ids.forEach((id, i) => {
+            if (values[i] === null || values[i] === undefined) {
+                return;
+            }
+            const strategy = (store[id.strategy] = store[id.strategy] || {});
+            (strategy[id.param] = strategy[id.param] || {})[id.role] = values[i];
+        });
+        return store;
+    }
+    """,
+    Output("param-values-store", "data"),
+    Input({"type": "opt-param", "strategy": ALL, "param": ALL, "role": ALL}, "value"),
+    State({"type": "opt-param", "strategy": ALL, "param": ALL, "role": ALL}, "id"),
+)
+
+
+# The three charts only read the finished backtest, so they're built and
+# serialized side by side while the metrics and trade log are computed
+_FIG_POOL = ThreadPoolExecutor(max_workers=3)
+
+
+def _fig_to_json(fig):
+    # Serialized once here (orjson, no schema validation) and stored as a
+    # string, instead of a nested dict Dash re-encodes on every store access
+    return fig.to_json(validate=False, pretty=False, engine="orjson")
+
+
+def _pack_trade_log(trade_log):
+    # stored-trade-log holds zlib-compressed JSON as base64 text, a fraction of
+    # the raw row dicts. It is write-only: the visible table is built in
+    # run_backtest, so the log never has to be posted back to be rendered.
+    return base64.b64encode(zlib.compress(orjson.dumps(trade_log))).decode()
+
+
+def _error(msg):
+    # Clear stores on error so the renderer doesn't try to draw stale charts.
+    # The trade-log copy shares the table's key so React swaps it in place.
+    return (
+        None,
+        None,
+        None,
+        html.Div(msg, style={"color": "red"}),
+        None,
+        html.Div(msg, style={"color": "red"}, key="trade-table-slot"),
+    )
+
+
+def _pnl_color(pnl):
+    # Buy rows carry "" for P&L; breakeven sells stay unstyled
+    if pnl == "" or pnl == 0:
+        return ""
+    return "green" if pnl > 0 else "red"
+
+
+def _trade_table(trade_log):
+    # P&L colour is decided once here and carried in a field the table
+    # doesn't display, so the conditional styles are plain equality checks.
+    # (row_index rules would be page-relative under pagination.)
+    table_rows = [
+        {**row, "pnl_color": _pnl_color(row["P&L"])} for row in trade_log
+    ]
+    trade_table = dash_table.DataTable(
+        columns=[{"name": k, "id": k} for k in (trade_log[0].keys() if trade_log else [])],
+        data=table_rows,
+        style_table={"overflowX": "auto"},
+        style_cell={"textAlign": "center"},
+        page_size=10,
+        style_data_conditional=[
+            {
+                "if": {"filter_query": f'{{pnl_color}} = "{color}"', "column_id": "P&L"},
+                "color": color,
+                "fontWeight": "bold",
+            }
+            for color in ("green", "red")
+        ],
+    )
+    return html.Div(trade_table, key="trade-table-slot")
+
+
+@cache.memoize(timeout=3600)
+def _cached_backtest(strategy_name, symbol, start_date, end_date, params):
+    # Keyed on every input that determines the run, so re-clicking Run (or
+    # running the optimizer's best params again) skips the backtest and the
+    # Plotly figure builds entirely. Returns plain (picklable) data only; the
+    # DataTable is built by the callback.
+    strategy = _make_strategy(strategy_registry[strategy_name]["class"], params)
+    bt = Backtester(symbol, strategy)
+    bt.fetch_data(start_date, end_date)
+    bt.run()
+    figures = [
+        _FIG_POOL.submit(lambda build=build: _fig_to_json(build()))
+        for build in (bt.get_equity_curve_figure, bt.get_trade_signals_figure, bt.get_drawdown_figure)
+    ]
+    metrics = bt.evaluate() + bt.evaluate_trades()
+    trade_log = bt.get_trade_log()
+
+    return (*(f.result() for f in figures), metrics, trade_log)
+
 
 @app.callback(
     Output("stored-equity-figure", "data"),
@@ -144,60 +299,31 @@ def update_strategy_params_ui(selected_strategy):
     State("symbol-input", "value"),
     State("date-range", "start_date"),
     State("date-range", "end_date"),
-    State("strategy-params", "children"),
+    State("param-values-store", "data"),
+    running=[(Output("run-button", "disabled"), True, False)],
     prevent_initial_call=True,
 )
-def run_backtest(n_clicks, selected_strategy, symbol, start_date, end_date, param_children):
+def run_backtest(n_clicks, selected_strategy, symbol, start_date, end_date, param_store):
     if not n_clicks:
         raise PreventUpdate
 
-    # Parse param values (use the 'start' box as the single run value)
-    strategy_info = strategy_registry[selected_strategy]
-    param_values = {}
-    for row in (param_children or []):
-        try:
-            col = row["props"]["children"][1]
-            input_group = col["props"].get("children")
-            components = (input_group or {}).get("props", {}).get("children", [])
-            role_values = {}
-            param_name = None
-            for comp in components:
-                props = comp.get("props", {}) if isinstance(comp, dict) else {}
-                cid = props.get("id")
-                if isinstance(cid, dict) and cid.get("type") == "opt-param":
-                    role_values[cid["role"]] = props.get("value")
-                    param_name = cid["param"]
-            if role_values and param_name is not None:
-                val = role_values.get("start")
-                if val is not None:
-                    param_values[param_name] = int(val)
-        except Exception:
-            continue
+    # Use the 'start' box as the single run value
+    param_values = {
+        p: int(d["start"])
+        for p, d in (param_store or {}).get(selected_strategy, {}).items()
+        if "start" in d
+    }
 
     # Backtest
     try:
-        strategy = strategy_info["class"](**param_values)
-        bt = Backtester(symbol, strategy)
-        bt.fetch_data(start_date, end_date)
-        bt.run()
-        cum_ret, sharpe, max_dd, vol = bt.evaluate()
-        avg_pnl, win_rate, win_loss_ratio = bt.evaluate_trades()
-
-        equity_figure = bt.get_equity_curve_figure().to_dict()
-        signals_figure = bt.get_trade_signals_figure().to_dict()
-        drawdown_figure = bt.get_drawdown_figure().to_dict()
-        trade_log = bt.get_trade_log()
-
-        trade_table = dash_table.DataTable(
-            columns=[{"name": k, "id": k} for k in (trade_log[0].keys() if trade_log else [])],
-            data=trade_log,
-            style_table={"overflowX": "auto"},
-            style_cell={"textAlign": "center"},
-            page_size=10,
-            style_data_conditional=[
-                {"if": {"filter_query": "{P&L} > 0", "column_id": "P&L"}, "color": "green", "fontWeight": "bold"},
-                {"if": {"filter_query": "{P&L} < 0", "column_id": "P&L"}, "color": "red", "fontWeight": "bold"},
-            ],
+        (
+            equity_figure,
+            signals_figure,
+            drawdown_figure,
+            (cum_ret, sharpe, max_dd, vol, avg_pnl, win_rate, win_loss_ratio),
+            trade_log,
+        ) = _cached_backtest(
+            selected_strategy, symbol, start_date, end_date, tuple(sorted(param_values.items()))
         )
 
         metrics_string = (
@@ -215,91 +341,102 @@ def run_backtest(n_clicks, selected_strategy, symbol, start_date, end_date, para
             signals_figure,
             drawdown_figure,
             metrics_string,
-            trade_log,
-            trade_table,
+            _pack_trade_log(trade_log),
+            _trade_table(trade_log),
         )
     except Exception as e:
-        error_msg = html.Div(f"Error: {str(e)}", style={"color": "red"})
-        # Clear stores on error so the renderer doesn't try to draw stale charts
-        return None, None, None, error_msg, None, error_msg
-
+        return _error(f"Error: {str(e)}")
 
 
 @app.callback(
     Output("tab-content", "children"),
     Input("graph-tabs", "value"),
-    Input("stored-equity-figure", "data"),
-    Input("stored-signals-figure", "data"),
-    Input("stored-drawdown-figure", "data"),
 )
-def render_tab_content(tab, equity_fig, signals_fig, drawdown_fig):
+def render_tab_content(tab):
     # Optimizer tab: render only the optimizer UI (force a remount via key)
     if tab == "optimizer":
         return html.Div(
             [
                 dbc.Button("Run Optimization", id="optimize-button", color="success", className="mb-3 me-2"),
                 dbc.Button("Set Best Params", id="set-best-params", color="secondary", className="mb-3"),
+                dbc.Progress(id="opt-progress", value=0, className="mb-3"),
                 html.Div(id="optimization-output"),
             ],
             id="optimizer-pane",
             key="optimizer-pane",  # <- force React remount when switching tabs
         )
 
-    # Charts tabs — wrap graph in keyed container to avoid leaking props across tabs
-    fig = {
-        "equity": equity_fig,
-        "signals": signals_fig,
-        "drawdown": drawdown_fig,
-    }.get(tab)
-
-    content = dcc.Graph(figure=fig) if fig else html.Div("Run a backtest to see charts.")
-    return html.Div(content, id=f"{tab}-pane", key=f"{tab}-pane")
+    # Charts tabs — wrap graph in keyed container to avoid leaking props across tabs.
+    # The figure itself is filled in client-side from the stores below.
+    return html.Div(dcc.Graph(id="active-graph"), id=f"{tab}-pane", key=f"{tab}-pane")
+
+
+# Pick the visible tab's figure in the browser, so tab switches never ship the
+# stored figure JSON to the server and back
+app.clientside_callback(
+    """
+    function(tab, equity, signals, drawdown) {
+        const fig = {equity: equity, signals: signals, drawdown: drawdown}[tab];
+        if (!fig) {
+            return {
+                data: [],
+                layout: {
+                    xaxis: {visible: false},
+                    yaxis: {visible: false},
+                    annotations: [{text: "Run a backtest to see charts.", showarrow: false}]
+                }
+            };
+        }
+        return JSON.parse(fig);
+    }
+    """,
+    Output("active-graph", "figure"),
+    Input("graph-tabs", "value"),
+    Input("stored-equity-figure", "data"),
+    Input("stored-signals-figure", "data"),
+    Input("stored-drawdown-figure", "data"),
+)
 
 
 
 @app.callback(
     Output("optimization-output", "children"),
     Output("best-params-store", "data"),
+    Output("opt-session-id", "data"),
     Input("optimize-button", "n_clicks"),
     State("strategy-dropdown", "value"),
     State("symbol-input", "value"),
     State("date-range", "start_date"),
     State("date-range", "end_date"),
-    State("strategy-params", "children"),
+    State("param-values-store", "data"),
+    background=True,
+    progress=[Output("opt-progress", "value"), Output("opt-progress", "max")],
+    running=[
+        (Output("optimize-button", "disabled"), True, False),
+        (Output("set-best-params", "disabled"), True, False),
+    ],
     prevent_initial_call=True,
 )
-def run_optimizer(n_clicks, strategy_name, symbol, start, end, param_children):
+def run_optimizer(set_progress, n_clicks, strategy_name, symbol, start, end, param_store):
     if not n_clicks:
         raise PreventUpdate
 
-    if not param_children:
-        return html.Div("No strategy parameters found."), dash.no_update
+    raw_inputs = (param_store or {}).get(strategy_name)
+    if not raw_inputs:
+        return html.Div("No strategy parameters found."), dash.no_update, dash.no_update
 
     strategy_info = strategy_registry[strategy_name]
+    param_key_set = frozenset(strategy_info["params"])
     param_inputs = {}
 
-    # Parse Start/Stop/Step from dict IDs
-    for row in (param_children or []):
-        try:
-            col = row["props"]["children"][1]
-            input_group = col["props"].get("children")
-            components = (input_group or {}).get("props", {}).get("children", [])
-            for comp in components:
-                props = comp.get("props", {}) if isinstance(comp, dict) else {}
-                cid = props.get("id")
-                if isinstance(cid, dict) and cid.get("type") == "opt-param":
-                    p = cid.get("param")
-                    role = cid.get("role")
-                    val = props.get("value")
-                    if val is None:
-                        continue
-                    try:
-                        val = int(val)
-                    except (TypeError, ValueError):
-                        continue
-                    param_inputs.setdefault(p, {})[role] = val
-        except Exception:
-            continue
+    # Coerce Start/Stop/Step per param, dropping anything non-numeric
+    for p, roles in raw_inputs.items():
+        for role, val in roles.items():
+            try:
+                val = int(val)
+            except (TypeError, ValueError):
+                continue
+            param_inputs.setdefault(p, {})[role] = val
 
     # Build ranges
     param_ranges = {}
@@ -307,29 +444,34 @@ def run_optimizer(n_clicks, strategy_name, symbol, start, end, param_children):
         if all(k in d for k in ("start", "stop", "step")):
             if d["step"] == 0 or d["stop"] < d["start"]:
                 continue
-            param_ranges[p] = list(range(int(d["start"]), int(d["stop"]) + 1, int(d["step"])))
+            param_ranges[p] = range(d["start"], d["stop"] + 1, d["step"])
 
     if not param_ranges:
         return html.Div(
             "Please enter valid Start/Stop/Step values for at least one parameter.",
             style={"color": "red"},
-        ), dash.no_update
+        ), dash.no_update, dash.no_update
 
     # Run grid search
-    grid_results = run_parameter_grid_search(strategy_info["class"], symbol, start, end, param_ranges)
-    if not grid_results:
-        return html.Div("No results returned."), dash.no_update
+    # Typical grids run serially in this job; a large one starts a worker
+    # pool, and since the job process exits without running atexit hooks,
+    # that pool is released here
+    try:
+        grid_results = run_parameter_grid_search(
+            strategy_info["class"], symbol, start, end, param_ranges,
+            progress=lambda done, total: set_progress((done, total)),
+        )
+    finally:
+        _shutdown_executor()
+    if len(grid_results) == 0:
+        return html.Div("No results returned."), dash.no_update, dash.no_update
 
-    # Sort by Sharpe desc and add Rank
-    grid_results_sorted = sorted(
-        grid_results, key=lambda r: r.get("Sharpe", float("-inf")), reverse=True
-    )
-    for i, row in enumerate(grid_results_sorted, start=1):
-        row["Rank"] = i
+    # Sort by Sharpe desc (NaN last) on the structured array itself
+    ranked = grid_results[np.argsort(-grid_results["Sharpe"], kind="stable")]
 
     # Best params
-    best_row = grid_results_sorted[0]
-    best_params = {k: v for k, v in best_row.items() if k in strategy_info["params"].keys()}
+    best_row = ranked[0]
+    best_params = {k: best_row[k].item() for k in ranked.dtype.names if k in param_key_set}
 
     best_summary = html.Div(
         [
@@ -344,13 +486,25 @@ def run_optimizer(n_clicks, strategy_name, symbol, start, end, param_children):
         className="mb-2",
     )
 
+    # Keep the full result set server-side; the table only ever receives one
+    # page, converted to records as it is sent
+    results_df = pd.DataFrame(ranked)
+    results_df["Rank"] = np.arange(1, len(results_df) + 1)
+    session_id = str(uuid.uuid4())
+    cache.set(_opt_results_key(session_id), results_df, timeout=3600)
+
     table = dash_table.DataTable(
-        columns=[{"name": k, "id": k} for k in grid_results_sorted[0].keys()],
-        data=grid_results_sorted,
-        page_size=10,
-        sort_action="native",
+        id="opt-table",
+        columns=[{"name": k, "id": k} for k in results_df.columns],
+        data=results_df.iloc[:OPT_PAGE_SIZE].to_dict("records"),
+        page_action="custom",
+        page_current=0,
+        page_size=OPT_PAGE_SIZE,
+        page_count=math.ceil(len(results_df) / OPT_PAGE_SIZE),
+        sort_action="custom",
         sort_by=[{"column_id": "Sharpe", "direction": "desc"}],
-        filter_action="native",
+        filter_action="custom",
+        filter_query="",
         style_table={"overflowX": "auto"},
         style_cell={"textAlign": "center"},
         style_data_conditional=[
@@ -358,39 +512,121 @@ def run_optimizer(n_clicks, strategy_name, symbol, start, end, param_children):
         ],
     )
 
-    return html.Div([best_summary, table]), best_params
+    return html.Div([best_summary, table]), best_params, session_id
+
+
+OPT_PAGE_SIZE = 10
 
+_FILTER_OPERATORS = [
+    ["ge ", ">="],
+    ["le ", "<="],
+    ["lt ", "<"],
+    ["gt ", ">"],
+    ["ne ", "!="],
+    ["eq ", "="],
+    ["contains "],
+    ["datestartswith "],
+]
+
+
+def _opt_results_key(session_id):
+    return f"opt-results:{session_id}"
+
+
+def _split_filter_part(filter_part):
+    # Parse one "{column} op value" clause of a DataTable filter_query
+    for operator_type in _FILTER_OPERATORS:
+        for operator in operator_type:
+            if operator in filter_part:
+                name_part, value_part = filter_part.split(operator, 1)
+                name = name_part[name_part.find("{") + 1 : name_part.rfind("}")]
+
+                value_part = value_part.strip()
+                v0 = value_part[:1]
+                if v0 and v0 == value_part[-1] and v0 in ("'", '"', "`"):
+                    value = value_part[1:-1].replace("\\" + v0, v0)
+                else:
+                    try:
+                        value = float(value_part)
+                    except ValueError:
+                        value = value_part
+
+                return name, operator_type[0].strip(), value
+
+    return None, None, None
 
 
 @app.callback(
-    Output({"type": "opt-param", "param": ALL, "role": "start"}, "value"),
-    Output({"type": "opt-param", "param": ALL, "role": "stop"}, "value"),
-    Output({"type": "opt-param", "param": ALL, "role": "step"}, "value"),
-    Input("set-best-params", "n_clicks"),
-    State("best-params-store", "data"),
-    State({"type": "opt-param", "param": ALL, "role": "start"}, "id"),
-    State({"type": "opt-param", "param": ALL, "role": "stop"}, "id"),
-    State({"type": "opt-param", "param": ALL, "role": "step"}, "id"),
+    Output("opt-table", "data"),
+    Output("opt-table", "page_count"),
+    Input("opt-table", "page_current"),
+    Input("opt-table", "page_size"),
+    Input("opt-table", "sort_by"),
+    Input("opt-table", "filter_query"),
+    State("opt-session-id", "data"),
     prevent_initial_call=True,
 )
-def apply_best_params(n_clicks, best_params, start_ids, stop_ids, step_ids):
-    if not n_clicks or not best_params:
+def page_optimizer_table(page_current, page_size, sort_by, filter_query, session_id):
+    df = cache.get(_opt_results_key(session_id)) if session_id else None
+    if df is None:
         raise PreventUpdate
 
-    start_vals = [None] * len(start_ids)
-    stop_vals = [None] * len(stop_ids)
-    step_vals = [1] * len(step_ids)  # default step=1
-
-    for i, id_obj in enumerate(start_ids):
-        p = id_obj.get("param")
-        if p in best_params:
-            start_vals[i] = int(best_params[p])
-    for i, id_obj in enumerate(stop_ids):
-        p = id_obj.get("param")
-        if p in best_params:
-            stop_vals[i] = int(best_params[p])
+    for part in (filter_query or "").split(" && "):
+        col, op, value = _split_filter_part(part)
+        if col not in df:
+            continue
+        if op in ("eq", "ne", "lt", "le", "gt", "ge"):
+            df = df.loc[getattr(df[col], op)(value)]
+        elif op == "contains":
+            df = df.loc[df[col].astype(str).str.contains(str(value), regex=False)]
+        elif op == "datestartswith":
+            df = df.loc[df[col].astype(str).str.startswith(str(value))]
+
+    if sort_by:
+        df = df.sort_values(
+            [s["column_id"] for s in sort_by],
+            ascending=[s["direction"] == "asc" for s in sort_by],
+            kind="stable",
+        )
 
-    return start_vals, stop_vals, step_vals
+    page_current = page_current or 0
+    start = page_current * page_size
+    page = df.iloc[start:start + page_size].to_dict("records")
+    return page, max(1, math.ceil(len(df) / page_size))
+
+
+
+# Pure data shuffling, so it runs in the browser with no server round trip
+app.clientside_callback(
+    """
+    function(n_clicks, bestParams, strategy, startIds, stopIds, stepIds, startVals, stopVals, stepVals) {
+        if (!n_clicks || !bestParams || Object.keys(bestParams).length === 0) {
+            throw window.dash_clientside.PreventUpdate;
+        }
+        // Only the selected strategy's controls change; the hidden ones keep their values
+        const apply = (ids, vals, f) => ids.map((id, i) => (id.strategy === strategy ? f(id) : vals[i]));
+        const best = (id) => (id.param in bestParams ? Math.trunc(bestParams[id.param]) : null);
+        return [
+            apply(startIds, startVals, best),
+            apply(stopIds, stopVals, best),
+            apply(stepIds, stepVals, () => 1),  // default step=1
+        ];
+    }
+    """,
+    Output({"type": "opt-param", "strategy": ALL, "param": ALL, "role": "start"}, "value"),
+    Output({"type": "opt-param", "strategy": ALL, "param": ALL, "role": "stop"}, "value"),
+    Output({"type": "opt-param", "strategy": ALL, "param": ALL, "role": "step"}, "value"),
+    Input("set-best-params", "n_clicks"),
+    State("best-params-store", "data"),
+    State("strategy-dropdown", "value"),
+    State({"type": "opt-param", "strategy": ALL, "param": ALL, "role": "start"}, "id"),
+    State({"type": "opt-param", "strategy": ALL, "param": ALL, "role": "stop"}, "id"),
+    State({"type": "opt-param", "strategy": ALL, "param": ALL, "role": "step"}, "id"),
+    State({"type": "opt-param", "strategy": ALL, "param": ALL, "role": "start"}, "value"),
+    State({"type": "opt-param", "strategy": ALL, "param": ALL, "role": "stop"}, "value"),
+    State({"type": "opt-param", "strategy": ALL, "param": ALL, "role": "step"}, "value"),
+    prevent_initial_call=True,
+)
 
 
 if __name__ == "__main__":
@@ -1,9 +1,18 @@
 # main.py
+import webbrowser
+from pathlib import Path
+
 from core.backtester import Backtester
 from core.strategies import MovingAverageCrossoverStrategy
 
-import plotly.io as pio
-pio.renderers.default = "browser"
+
+def open_figure(fig, filename):
+    # Written once as a static page (plotly.js from CDN, no schema validation)
+    # instead of .show() spinning up a local server per figure
+    path = Path(filename).resolve()
+    fig.write_html(path, include_plotlyjs="cdn", full_html=True, validate=False)
+    webbrowser.open(path.as_uri())
+
 
 if __name__ == "__main__":
     strategy = MovingAverageCrossoverStrategy(short_window=20, long_window=50)
@@ -12,11 +21,9 @@ if __name__ == "__main__":
     bt.fetch_data("2015-01-01", "2024-12-31")
     bt.run()
 
-    cumulative_return, sharpe_ratio = bt.evaluate()
+    cumulative_return, sharpe_ratio, _, _ = bt.evaluate()
     print(f"Cumulative Return: {cumulative_return:.2%}")
     print(f"Sharpe Ratio: {sharpe_ratio:.2f}")
 
-    bt.get_equity_curve_figure().show()
-    bt.get_trade_signals_figure().show()
-
-
+    open_figure(bt.get_equity_curve_figure(), "equity.html")
+    open_figure(bt.get_trade_signals_figure(), "signals.html")